@@ -0,0 +1,121 @@
+"""Heap-based discrete-event kernel for staffing sweeps.
+
+Replays the precomputed patient flows (masks, service times, arrival
+gaps) without SimPy's Process/Event machinery: a single binary heap of
+(time, seq, patient, pc) tuples drives the run, and resources are plain
+counters with FIFO deques. Statistically equivalent to the SimPy engine
+but not event-for-event identical, since simultaneous events may resolve
+in a different order.
+"""
+import heapq
+from collections import deque
+
+import numpy as np
+
+# Op codes for the straight-line flow programs.
+_SEIZE, _DELAY, _RELEASE = 0, 1, 2
+
+# Resource slots, in the same order as the capacities tuple from main.
+_FD, _FN, _ED, _EN, _BED = range(5)
+
+
+def _program_for(mask):
+    """Op sequence for one flow mask; mirrors the templates in main.py."""
+    if mask & 8:  # fast track
+        ops = [(_SEIZE, _FD), (_DELAY, 'consult'), (_RELEASE, _FD)]
+        if mask & 4:
+            ops += [(_SEIZE, _FN), (_DELAY, 'fast_lab'), (_RELEASE, _FN),
+                    (_DELAY, 'fast_lab_wait'),
+                    (_SEIZE, _FD), (_DELAY, 'review'), (_RELEASE, _FD)]
+        ops += [(_SEIZE, _FN), (_DELAY, 'medication'), (_RELEASE, _FN)]
+    else:
+        ops = [(_SEIZE, _ED), (_DELAY, 'consult'), (_RELEASE, _ED)]
+        if mask & 2:
+            ops += [(_SEIZE, _EN), (_DELAY, 'ed_lab'), (_RELEASE, _EN),
+                    (_DELAY, 'ed_lab_wait'),
+                    (_SEIZE, _ED), (_DELAY, 'review'), (_RELEASE, _ED)]
+        if mask & 1:
+            ops += [(_SEIZE, _BED), (_DELAY, 'admit'), (_RELEASE, _BED)]
+        else:
+            ops += [(_SEIZE, _EN), (_DELAY, 'medication'), (_RELEASE, _EN)]
+    return tuple(ops)
+
+
+_PROGRAMS = tuple(_program_for(mask) for mask in range(16))
+
+
+class _Resource:
+    __slots__ = ('count', 'capacity', 'queue')
+
+    def __init__(self, capacity):
+        self.count = 0
+        self.capacity = capacity
+        self.queue = deque()
+
+
+def run_sim(flows, services, gaps, wait_times, metrics, capacities, sim_time, interval=5):
+    """Run the full simulation, filling wait_times and metrics in place."""
+    res = [_Resource(c) for c in capacities]
+
+    # Resolve op arguments once: resources to objects, delays to arrays.
+    progs = tuple(
+        tuple((kind, services.__dict__[arg] if kind == _DELAY else res[arg])
+              for kind, arg in prog)
+        for prog in _PROGRAMS
+    )
+
+    # Patient i enters at the sum of the gaps before it; the first gap is
+    # only waited out after patient 0 has been spawned.
+    arrivals = np.concatenate(([0.0], np.cumsum(gaps[:-1], dtype=np.float64)))
+
+    heap = [(float(t), i, i, 0) for i, t in enumerate(arrivals)]
+    heap += [(float(t), -1, -1, 0) for t in np.arange(0.0, sim_time, interval)]
+    heapq.heapify(heap)
+    seq = len(flows)
+
+    fd, fn, ed, en, bed = res
+    while heap:
+        t, _, idx, pc = heapq.heappop(heap)
+        if t >= sim_time:
+            break
+
+        if idx < 0:  # monitor tick; layouts match main.make_metrics
+            metrics.data[metrics.n] = (t,
+                                       len(fd.queue) + len(fn.queue),
+                                       len(ed.queue) + len(en.queue))
+            metrics.util[metrics.n] = (100 * fd.count // fd.capacity,
+                                       100 * fn.count // fn.capacity,
+                                       100 * ed.count // ed.capacity,
+                                       100 * en.count // en.capacity,
+                                       100 * bed.count // bed.capacity)
+            metrics.n += 1
+            continue
+
+        ready = [(idx, pc)]
+        while ready:
+            idx, pc = ready.pop()
+            ops = progs[flows[idx]]
+            blocked = False
+            while pc < len(ops):
+                kind, arg = ops[pc]
+                if kind == _SEIZE:
+                    if arg.count < arg.capacity:
+                        arg.count += 1
+                        pc += 1
+                    else:
+                        arg.queue.append((idx, pc + 1))
+                        blocked = True
+                        break
+                elif kind == _DELAY:
+                    heapq.heappush(heap, (t + float(arg[idx]), seq, idx, pc + 1))
+                    seq += 1
+                    blocked = True
+                    break
+                else:  # _RELEASE: hand the slot straight to the next waiter
+                    if arg.queue:
+                        ready.append(arg.queue.popleft())
+                    else:
+                        arg.count -= 1
+                    pc += 1
+            if not blocked:
+                wait_times[idx] = t - arrivals[idx]
@@ -1,117 +1,298 @@
 import os
+import sys
 import simpy
 import numpy as np
-import random
 import argparse
-from collections import defaultdict
-import matplotlib.pyplot as plt
+from multiprocessing import Pool
+from types import SimpleNamespace
+from numba import njit
+from scipy.stats import truncnorm
 import pandas as pd
 from tabulate import tabulate
 
 # ------------------- Hospital Class ------------------- #
+class MonitoredResource(simpy.Resource):
+    """Resource that fires an on_change callback after every put/get.
+
+    The hooks sit on _trigger_put/_trigger_get rather than _do_put/
+    _do_get: the latter fire mid-loop, before a just-granted request is
+    popped from put_queue, which would snapshot queue lengths one too
+    high.
+    """
+
+    on_change = None
+
+    def _trigger_put(self, get_event):
+        super()._trigger_put(get_event)
+        if self.on_change is not None:
+            self.on_change()
+
+    def _trigger_get(self, put_event):
+        super()._trigger_get(put_event)
+        if self.on_change is not None:
+            self.on_change()
+
+
 class Hospital:
     def __init__(self, env, fast_doctors, fast_nurses, ed_doctors, ed_nurses, beds):
         self.env = env
-        self.fast_doctor = simpy.Resource(env, fast_doctors)
-        self.fast_nurse = simpy.Resource(env, fast_nurses)
-        self.ed_doctor = simpy.Resource(env, ed_doctors)
-        self.ed_nurse = simpy.Resource(env, ed_nurses)
-        self.beds = simpy.Resource(env, beds)
+        self.fast_doctor = MonitoredResource(env, fast_doctors)
+        self.fast_nurse = MonitoredResource(env, fast_nurses)
+        self.ed_doctor = MonitoredResource(env, ed_doctors)
+        self.ed_nurse = MonitoredResource(env, ed_nurses)
+        self.beds = MonitoredResource(env, beds)
+
 
-    def consult(self):
-        yield self.env.timeout(max(5, np.random.normal(20, 5)))
+def _truncnorm(rng, lo, mu, sd, n):
+    """One vectorized truncated-normal draw on [lo, inf) as float32."""
+    return truncnorm.rvs((lo - mu) / sd, np.inf, loc=mu, scale=sd, size=n, random_state=rng).astype(np.float32)
 
-    def medication(self):
-        yield self.env.timeout(max(5, np.random.normal(15, 3)))
 
-    def review(self):
-        yield self.env.timeout(max(3, np.random.normal(10, 3)))
+def sample_services(rng, n_patients):
+    """Draw all service times for the run in one vectorized pass per service."""
+    return SimpleNamespace(
+        consult=_truncnorm(rng, 5, 20, 5, n_patients),
+        medication=_truncnorm(rng, 5, 15, 3, n_patients),
+        review=_truncnorm(rng, 3, 10, 3, n_patients),
+        admit=_truncnorm(rng, 5, 30, 5, n_patients),
+        fast_lab=_truncnorm(rng, 1, 6, 3, n_patients),
+        fast_lab_wait=_truncnorm(rng, 10, 25, 5, n_patients),
+        ed_lab_wait=_truncnorm(rng, 15, 40, 10, n_patients),
+        ed_lab=_truncnorm(rng, 3, 10, 4, n_patients),
+    )
 
-    def admit(self):
-        yield self.env.timeout(max(5, np.random.normal(30, 5)))
 
-    def fast_lab(self):
-        yield self.env.timeout(max(1, np.random.normal(6, 3)))
-    
-    def fast_lab_wait(self):
-        yield self.env.timeout(max(10, np.random.normal(25, 5)))
+# Flow mask bits, packed per patient: is_fast | need_fast_lab | need_ed_lab | need_bed.
+_IS_FAST, _FAST_LAB, _ED_LAB, _BED = 8, 4, 2, 1
 
-    def ed_lab_wait(self):
-        yield self.env.timeout(max(15, np.random.normal(40, 10)))
 
-    def ed_lab(self):
-        yield self.env.timeout(max(3, np.random.normal(10, 4)))
+def sample_flows(rng, n_patients):
+    """Materialize every routing decision upfront, packed into a uint8 mask."""
+    u = rng.random((n_patients, 4), dtype=np.float32)
+    return ((u[:, 0] < 0.3).astype(np.uint8) << 3
+            | (u[:, 1] < 0.3).astype(np.uint8) << 2
+            | (u[:, 2] < 0.7).astype(np.uint8) << 1
+            | (u[:, 3] < 0.5).astype(np.uint8))
 
 
 # ------------------- Patient Process ------------------- #
-def patient(env, name, hospital, wait_times):
+# Straight-line flow templates, one per distinct path through the ED.
+# The per-patient branching happens once, at dispatch on the flow mask.
+# Requests are paired with explicit releases rather than with-blocks,
+# skipping the context-manager bookkeeping on every acquisition.
+def _flow_fast(env, idx, hospital, services):
+    req = hospital.fast_doctor.request()
+    yield req
+    yield env.timeout(services.consult[idx])
+    hospital.fast_doctor.release(req)
+    req = hospital.fast_nurse.request()
+    yield req
+    yield env.timeout(services.medication[idx])
+    hospital.fast_nurse.release(req)
+
+
+def _flow_fast_lab(env, idx, hospital, services):
+    req = hospital.fast_doctor.request()
+    yield req
+    yield env.timeout(services.consult[idx])
+    hospital.fast_doctor.release(req)
+    req = hospital.fast_nurse.request()
+    yield req
+    yield env.timeout(services.fast_lab[idx])
+    hospital.fast_nurse.release(req)
+    yield env.timeout(services.fast_lab_wait[idx])
+    req = hospital.fast_doctor.request()
+    yield req
+    yield env.timeout(services.review[idx])
+    hospital.fast_doctor.release(req)
+    req = hospital.fast_nurse.request()
+    yield req
+    yield env.timeout(services.medication[idx])
+    hospital.fast_nurse.release(req)
+
+
+def _flow_ed_med(env, idx, hospital, services):
+    req = hospital.ed_doctor.request()
+    yield req
+    yield env.timeout(services.consult[idx])
+    hospital.ed_doctor.release(req)
+    req = hospital.ed_nurse.request()
+    yield req
+    yield env.timeout(services.medication[idx])
+    hospital.ed_nurse.release(req)
+
+
+def _flow_ed_bed(env, idx, hospital, services):
+    req = hospital.ed_doctor.request()
+    yield req
+    yield env.timeout(services.consult[idx])
+    hospital.ed_doctor.release(req)
+    req = hospital.beds.request()
+    yield req
+    yield env.timeout(services.admit[idx])
+    hospital.beds.release(req)
+
+
+def _flow_ed_lab_med(env, idx, hospital, services):
+    req = hospital.ed_doctor.request()
+    yield req
+    yield env.timeout(services.consult[idx])
+    hospital.ed_doctor.release(req)
+    req = hospital.ed_nurse.request()
+    yield req
+    yield env.timeout(services.ed_lab[idx])
+    hospital.ed_nurse.release(req)
+    yield env.timeout(services.ed_lab_wait[idx])
+    req = hospital.ed_doctor.request()
+    yield req
+    yield env.timeout(services.review[idx])
+    hospital.ed_doctor.release(req)
+    req = hospital.ed_nurse.request()
+    yield req
+    yield env.timeout(services.medication[idx])
+    hospital.ed_nurse.release(req)
+
+
+def _flow_ed_lab_bed(env, idx, hospital, services):
+    req = hospital.ed_doctor.request()
+    yield req
+    yield env.timeout(services.consult[idx])
+    hospital.ed_doctor.release(req)
+    req = hospital.ed_nurse.request()
+    yield req
+    yield env.timeout(services.ed_lab[idx])
+    hospital.ed_nurse.release(req)
+    yield env.timeout(services.ed_lab_wait[idx])
+    req = hospital.ed_doctor.request()
+    yield req
+    yield env.timeout(services.review[idx])
+    hospital.ed_doctor.release(req)
+    req = hospital.beds.request()
+    yield req
+    yield env.timeout(services.admit[idx])
+    hospital.beds.release(req)
+
+
+def _template_for(mask):
+    if mask & _IS_FAST:
+        return _flow_fast_lab if mask & _FAST_LAB else _flow_fast
+    if mask & _ED_LAB:
+        return _flow_ed_lab_bed if mask & _BED else _flow_ed_lab_med
+    return _flow_ed_bed if mask & _BED else _flow_ed_med
+
+
+# 16-entry dispatch table indexed directly by the packed flow mask.
+_FLOW_TEMPLATES = tuple(_template_for(mask) for mask in range(16))
+
+
+def patient(env, idx, hospital, flows, services, wait_times):
     arrival_time = env.now
-    is_fast_track = random.random() < 0.3
-
-    if is_fast_track:
-        with hospital.fast_doctor.request() as req:
-            yield req
-            yield env.process(hospital.consult())
-
-        if random.random() < 0.3:
-            with hospital.fast_nurse.request() as req:
-                yield req
-                yield env.process(hospital.fast_lab())
-            yield env.process(hospital.fast_lab_wait())
-            with hospital.fast_doctor.request() as req:
-                yield req
-                yield env.process(hospital.review())
-
-        with hospital.fast_nurse.request() as req:
-            yield req
-            yield env.process(hospital.medication())
-
-    else:
-        with hospital.ed_doctor.request() as req:
-            yield req
-            yield env.process(hospital.consult())
-
-        if random.random() < 0.7:
-            with hospital.ed_nurse.request() as req:
-                yield req
-                yield env.process(hospital.ed_lab())
-            yield env.process(hospital.ed_lab_wait())
-            with hospital.ed_doctor.request() as req:
-                yield req
-                yield env.process(hospital.review())
-
-        if random.random() < 0.5:
-            with hospital.beds.request() as req:
-                yield req
-                yield env.process(hospital.admit())
-        else:
-            with hospital.ed_nurse.request() as req:
-                yield req
-                yield env.process(hospital.medication())
-
-    wait_times.append(env.now - arrival_time)
+    yield from _FLOW_TEMPLATES[flows[idx]](env, idx, hospital, services)
+    wait_times[idx] = env.now - arrival_time
 
 
 # ------------------- Monitoring ------------------- #
-def monitor(env, hospital, metrics, interval=5):
-    while True:
-        metrics['timeline'].append(env.now)
-        metrics['queue_fast'].append(len(hospital.fast_doctor.queue) + len(hospital.fast_nurse.queue))
-        metrics['queue_ed'].append(len(hospital.ed_doctor.queue) + len(hospital.ed_nurse.queue))
-
-        metrics['util_fast_doc'].append(hospital.fast_doctor.count / hospital.fast_doctor.capacity)
-        metrics['util_fast_nurse'].append(hospital.fast_nurse.count / hospital.fast_nurse.capacity)
-        metrics['util_ed_doc'].append(hospital.ed_doctor.count / hospital.ed_doctor.capacity)
-        metrics['util_ed_nurse'].append(hospital.ed_nurse.count / hospital.ed_nurse.capacity)
-        metrics['util_beds'].append(hospital.beds.count / hospital.beds.capacity)
-
-        yield env.timeout(interval)
+# Column layout of the grid-expanded metrics block handed to report.
+# In storage the first three columns live in a float32 array and the
+# five utilizations in a uint8 array on a 0-100 scale.
+METRIC_COLS = {'timeline': 0, 'queue_fast': 1, 'queue_ed': 2, 'util_fast_doc': 3,
+               'util_fast_nurse': 4, 'util_ed_doc': 5, 'util_ed_nurse': 6, 'util_beds': 7}
+
+
+def make_metrics(sim_time, n_patients, interval=5):
+    """Preallocate the time/queue block and the quantized utilization block.
+
+    Sized for the heartbeat grid plus the worst-case number of state
+    changes (each patient touches at most five resources, each good for
+    a queue-join, a grant and a release snapshot).
+    """
+    n_rows = sim_time // interval + 1 + 16 * n_patients
+    return SimpleNamespace(data=np.empty((n_rows, 3), dtype=np.float32),
+                           util=np.empty((n_rows, 5), dtype=np.uint8),
+                           n=0, sim_time=sim_time, interval=interval)
+
+
+@njit(cache=True)
+def _record(data, util, step, t, qf, qe, pfd, pfn, ped, pen, pb):
+    data[step, 0] = t
+    data[step, 1] = qf
+    data[step, 2] = qe
+    util[step, 0] = pfd
+    util[step, 1] = pfn
+    util[step, 2] = ped
+    util[step, 3] = pen
+    util[step, 4] = pb
+
+
+def attach_monitor(env, hospital, metrics, interval=5):
+    """Snapshot resource state on change, plus a heartbeat for the plot grid."""
+    # Capacities are fixed for the run; cache 100/capacity so each
+    # snapshot produces the 0-100 utilization scale with one multiply.
+    pct_fd = 100.0 / hospital.fast_doctor.capacity
+    pct_fn = 100.0 / hospital.fast_nurse.capacity
+    pct_ed = 100.0 / hospital.ed_doctor.capacity
+    pct_en = 100.0 / hospital.ed_nurse.capacity
+    pct_bed = 100.0 / hospital.beds.capacity
+
+    last_state = [None]
+
+    def snapshot(force=False):
+        # SimPy resources can't cross into nopython mode, so read the
+        # counts here and hand plain scalars to the jitted recorder.
+        state = (len(hospital.fast_doctor.queue) + len(hospital.fast_nurse.queue),
+                 len(hospital.ed_doctor.queue) + len(hospital.ed_nurse.queue),
+                 hospital.fast_doctor.count * pct_fd,
+                 hospital.fast_nurse.count * pct_fn,
+                 hospital.ed_doctor.count * pct_ed,
+                 hospital.ed_nurse.count * pct_en,
+                 hospital.beds.count * pct_bed)
+        if not force and state == last_state[0]:
+            return
+        last_state[0] = state
+        step = metrics.n
+        _record(metrics.data, metrics.util, step, env.now, *state)
+        metrics.n = step + 1
+
+    for resource in (hospital.fast_doctor, hospital.fast_nurse,
+                     hospital.ed_doctor, hospital.ed_nurse, hospital.beds):
+        resource.on_change = snapshot
+
+    def heartbeat():
+        while True:
+            snapshot(force=True)
+            yield env.timeout(interval)
+
+    env.process(heartbeat())
+
+
+def expand_to_grid(metrics):
+    """Expand the piecewise-constant snapshots onto the heartbeat grid.
+
+    Returns one float32 block laid out per METRIC_COLS, dequantizing the
+    uint8 utilizations back to [0, 1].
+    """
+    # Derive the grid from sim_time, not the last snapshot time, so every
+    # replication expands to the same shape no matter when the final
+    # state change lands.
+    data = metrics.data[:metrics.n]
+    times = data[:, 0]
+    grid = np.arange(0.0, metrics.sim_time, metrics.interval, dtype=np.float32)
+    # The last snapshot at or before each grid point carries its state.
+    rows = np.searchsorted(times, grid, side='right') - 1
+    expanded = np.concatenate(
+        (data[rows], metrics.util[:metrics.n][rows].astype(np.float32) / 100.0), axis=1)
+    expanded[:, 0] = grid
+    return expanded
 
 
 # ------------------- Reporting ------------------- #
-def report(wait_times, metrics):
-    avg_wait = np.mean(wait_times)
-    max_wait = np.max(wait_times)
+def report(wait_times, data, no_plot=False):
+    # data is the grid-expanded block; one strided reduction covers every column.
+    means = data.mean(axis=0)
+    metrics = {name: data[:, col] for name, col in METRIC_COLS.items()}
+
+    avg_wait = np.nanmean(wait_times)
+    max_wait = np.nanmax(wait_times)
 
     print("=== Simulation Results ===")
     print(f"Average Wait Time: {int(avg_wait)} min")
@@ -119,75 +300,110 @@ def report(wait_times, metrics):
 
     print("--- Average Queue Lengths ---")
     queue_data = [
-        ["Fast-Track Queue", f"{np.mean(metrics['queue_fast']):.2f}"],
-        ["Main ED Queue", f"{np.mean(metrics['queue_ed']):.2f}"]
+        ["Fast-Track Queue", f"{means[METRIC_COLS['queue_fast']]:.2f}"],
+        ["Main ED Queue", f"{means[METRIC_COLS['queue_ed']]:.2f}"]
     ]
     print(tabulate(queue_data, headers=["Queue Type", "Avg Length"], tablefmt="github"))
     print()
 
     # Summary Table
     summary_data = [
-        ["Fast-Track Doctor Util", f"{100 * np.mean(metrics['util_fast_doc']):.2f}%"],
-        ["Fast-Track Nurse Util", f"{100 * np.mean(metrics['util_fast_nurse']):.2f}%"],
-        ["Main ED Doctor Util", f"{100 * np.mean(metrics['util_ed_doc']):.2f}%"],
-        ["Main ED Nurse Util", f"{100 * np.mean(metrics['util_ed_nurse']):.2f}%"],
-        ["Bed Utilization", f"{100 * np.mean(metrics['util_beds']):.2f}%"]
+        ["Fast-Track Doctor Util", f"{100 * means[METRIC_COLS['util_fast_doc']]:.2f}%"],
+        ["Fast-Track Nurse Util", f"{100 * means[METRIC_COLS['util_fast_nurse']]:.2f}%"],
+        ["Main ED Doctor Util", f"{100 * means[METRIC_COLS['util_ed_doc']]:.2f}%"],
+        ["Main ED Nurse Util", f"{100 * means[METRIC_COLS['util_ed_nurse']]:.2f}%"],
+        ["Bed Utilization", f"{100 * means[METRIC_COLS['util_beds']]:.2f}%"]
     ]
     print("--- Resource Utilization Summary ---")
     print(tabulate(summary_data, headers=["Resource", "Avg Utilization"], tablefmt="github"))
 
+    if no_plot:
+        # Skip matplotlib entirely; dump the raw series for later analysis.
+        pd.DataFrame(metrics).to_parquet("metrics.parquet", compression="snappy")
+        return
+
+    # Deferred so --no-plot runs never pay the matplotlib import.
+    import matplotlib.pyplot as plt
+
     # Create output directory
     os.makedirs("plots", exist_ok=True)
 
-    # Plot 1: Queue Lengths and Utilization (Doctors and Nurses)
-    plt.figure(figsize=(14, 10))
-
-    plt.subplot(3, 1, 1)
-    plt.plot(metrics['timeline'], metrics['queue_fast'], label='Fast-Track Queue')
-    plt.plot(metrics['timeline'], metrics['queue_ed'], label='Main ED Queue')
-    plt.title('Queue Lengths Over Time')
-    plt.xlabel('Time (min)')
-    plt.ylabel('Queue Length')
-    plt.legend()
-    plt.grid(True)
-
-    plt.subplot(3, 1, 2)
-    plt.plot(metrics['timeline'], metrics['util_fast_doc'], label='Fast-Track Doctor')
-    plt.plot(metrics['timeline'], metrics['util_ed_doc'], label='Main ED Doctor')
-    plt.title('Doctor Utilization Over Time')
-    plt.xlabel('Time (min)')
-    plt.ylabel('Utilization (0-1)')
-    plt.legend()
-    plt.grid(True)
-
-    plt.subplot(3, 1, 3)
-    plt.plot(metrics['timeline'], metrics['util_fast_nurse'], label='Fast-Track Nurse')
-    plt.plot(metrics['timeline'], metrics['util_ed_nurse'], label='Main ED Nurse')
-    plt.title('Nurse Utilization Over Time')
-    plt.xlabel('Time (min)')
-    plt.ylabel('Utilization (0-1)')
-    plt.legend()
-    plt.grid(True)
-
-    plt.tight_layout()
-    plt.savefig("plots/queue_and_staff_utilization.png")
-    plt.close()
-
-    # Plot 2: Bed Utilization
-    plt.figure(figsize=(8, 4))
-    plt.plot(metrics['timeline'], metrics['util_beds'], label='Bed Utilization', color='brown')
-    plt.title('Admission Bed Utilization Over Time')
-    plt.xlabel('Time (min)')
-    plt.ylabel('Utilization (0-1)')
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig("plots/bed_utilization.png")
-    plt.close()
+    # Queue lengths and utilization, one figure with a shared x-axis so
+    # the tick locators are computed once and a single savefig renders
+    # everything. rasterized=True keeps the line draws to one raster pass.
+    fig, axes = plt.subplots(3, 1, figsize=(14, 10), sharex=True)
+
+    axes[0].plot(metrics['timeline'], metrics['queue_fast'], label='Fast-Track Queue', rasterized=True)
+    axes[0].plot(metrics['timeline'], metrics['queue_ed'], label='Main ED Queue', rasterized=True)
+    axes[0].set_title('Queue Lengths Over Time')
+    axes[0].set_ylabel('Queue Length')
+    axes[0].legend()
+    axes[0].grid(True)
+
+    axes[1].plot(metrics['timeline'], metrics['util_fast_doc'], label='Fast-Track Doctor', rasterized=True)
+    axes[1].plot(metrics['timeline'], metrics['util_ed_doc'], label='Main ED Doctor', rasterized=True)
+    axes[1].set_title('Doctor Utilization Over Time')
+    axes[1].set_ylabel('Utilization (0-1)')
+    axes[1].legend()
+    axes[1].grid(True)
+
+    axes[2].plot(metrics['timeline'], metrics['util_fast_nurse'], label='Fast-Track Nurse', rasterized=True)
+    axes[2].plot(metrics['timeline'], metrics['util_ed_nurse'], label='Main ED Nurse', rasterized=True)
+    axes[2].plot(metrics['timeline'], metrics['util_beds'], label='Admission Beds', color='brown', rasterized=True)
+    axes[2].set_title('Nurse and Bed Utilization Over Time')
+    axes[2].set_xlabel('Time (min)')
+    axes[2].set_ylabel('Utilization (0-1)')
+    axes[2].legend()
+    axes[2].grid(True)
+
+    fig.tight_layout()
+    fig.savefig("plots/queue_and_staff_utilization.png", dpi=100)
+    plt.close(fig)
 
 
 # ------------------- Main ------------------- #
+def run_once(seed, args):
+    """One independent replication; returns its wait_times and metrics."""
+    rng = np.random.default_rng(seed)
+
+    # One vectorized draw per decision/service type instead of scalar RNG
+    # calls inside every patient process.
+    flows = sample_flows(rng, args.n_patients)
+    services = sample_services(rng, args.n_patients)
+
+    # NaN marks patients still in the system when the run is cut off.
+    wait_times = np.full(args.n_patients, np.nan, dtype=np.float32)
+    metrics = make_metrics(args.sim_time, args.n_patients)
+
+    # All interarrival gaps in a single exponential draw.
+    gaps = rng.exponential(args.arrival_rate, args.n_patients).astype(np.float32)
+
+    if args.engine == 'fast':
+        from fastsim import run_sim
+        run_sim(flows, services, gaps, wait_times, metrics,
+                (args.fast_doctors, args.fast_nurses, args.ed_doctors, args.ed_nurses, args.beds),
+                args.sim_time)
+    else:
+        env = simpy.Environment()
+        hospital = Hospital(env, args.fast_doctors, args.fast_nurses, args.ed_doctors, args.ed_nurses, args.beds)
+
+        def patient_generator():
+            for i, gap in enumerate(gaps):
+                env.process(patient(env, i, hospital, flows, services, wait_times))
+                yield env.timeout(float(gap))
+
+        env.process(patient_generator())
+        attach_monitor(env, hospital, metrics)
+        env.run(until=args.sim_time)
+
+    return wait_times, metrics
+
+
 def main():
+    # Single-threaded workload: raising the switch interval cuts the
+    # interpreter's periodic thread-switch checks in the SimPy hot loop.
+    sys.setswitchinterval(1.0)
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--fast_doctors', type=int, default=1)
     parser.add_argument('--fast_nurses', type=int, default=1)
@@ -197,28 +413,36 @@ def main():
     parser.add_argument('--n_patients', type=int, default=144)
     parser.add_argument('--sim_time', type=int, default=1440)
     parser.add_argument('--arrival_rate', type=float, default=10)
+    parser.add_argument('--no-plot', action='store_true')
+    parser.add_argument('--engine', choices=['simpy', 'fast'], default='simpy',
+                        help="'fast' replays the precomputed flows through the heap kernel in fastsim.py")
+    parser.add_argument('--replications', type=int, default=1,
+                        help="independent replications, run in parallel across cores")
     args = parser.parse_args()
 
-    random.seed(42)
-    np.random.seed(42)
-
-    env = simpy.Environment()
-    hospital = Hospital(env, args.fast_doctors, args.fast_nurses, args.ed_doctors, args.ed_nurses, args.beds)
-
-    wait_times = []
-    metrics = defaultdict(list)
-
-    def patient_generator():
-        for i in range(args.n_patients):
-            env.process(patient(env, f"Patient {i+1}", hospital, wait_times))
-            yield env.timeout(np.random.exponential(args.arrival_rate))
-
-    env.process(patient_generator())
-    env.process(monitor(env, hospital, metrics))
-    env.run(until=args.sim_time)
+    if args.replications > 1:
+        # Independent seeds, one worker per replication up to the core count.
+        seeds = [(42 + r, args) for r in range(args.replications)]
+        with Pool(min(os.cpu_count(), args.replications)) as pool:
+            results = pool.starmap(run_once, seeds)
+
+        rep_means = np.array([np.nanmean(w) for w, _ in results])
+        half_width = 1.96 * rep_means.std(ddof=1) / np.sqrt(args.replications)
+        print(f"Avg wait over {args.replications} replications: "
+              f"{rep_means.mean():.1f} ± {half_width:.1f} min (95% CI)\n")
+
+        # Pool the waits and average the metric grids (grid points align
+        # across replications) so report runs once on the aggregate.
+        wait_times = np.concatenate([w for w, _ in results])
+        data = np.stack([expand_to_grid(m) for _, m in results]).mean(axis=0)
+    else:
+        wait_times, metrics = run_once(42, args)
+        data = expand_to_grid(metrics)
 
-    report(wait_times, metrics)
+    report(wait_times, data, no_plot=args.no_plot)
 
 
 if __name__ == '__main__':
+    # SimPy is pure Python, so long runs also work well under PyPy:
+    #   pypy3 main.py --sim_time 14400
     main()